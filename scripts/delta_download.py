@@ -11,7 +11,11 @@ import asyncio
 import csv
 import os
 import sys
+from contextlib import nullcontext
 from pathlib import Path
+from typing import AsyncIterator, Callable
+
+import orjson
 
 # Add src to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
@@ -19,47 +23,98 @@ sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 from irdai_scraper.config import PAGE_CONFIGS, ProductType, ScraperConfig
 from irdai_scraper.downloader.async_downloader import AsyncFileDownloader
 from irdai_scraper.downloader.file_manager import FileManager
-from irdai_scraper.models import DownloadTask
+from irdai_scraper.models import DownloadTask, InsuranceProduct
 from irdai_scraper.scraper.health import HealthInsuranceScraper
 from irdai_scraper.scraper.life import LifeInsuranceScraper
 from irdai_scraper.scraper.life_list import LifeProductListScraper
 from irdai_scraper.scraper.nonlife import NonLifeInsuranceScraper
 from irdai_scraper.storage.csv_writer import CSVWriter
+from irdai_scraper.utils import run_async, url_key
+
+
+# Seconds between download progress lines
+PROGRESS_INTERVAL = 0.5
+
+# New products are downloaded in batches of this size while scraping continues
+DOWNLOAD_BATCH_SIZE = 50
+
+_SCRAPERS: dict[ProductType, type] = {
+    ProductType.LIFE: LifeInsuranceScraper,
+    ProductType.LIFE_LIST: LifeProductListScraper,
+    ProductType.NONLIFE: NonLifeInsuranceScraper,
+    ProductType.HEALTH: HealthInsuranceScraper,
+}
+
+_CSV_NAMES: dict[ProductType, str] = {
+    ProductType.LIFE: "life_insurance_products.csv",
+    ProductType.LIFE_LIST: "life_products_list.csv",
+    ProductType.NONLIFE: "nonlife_insurance_products.csv",
+    ProductType.HEALTH: "health_insurance_products.csv",
+}
 
 
 def get_scraper_class(product_type: ProductType):
     """Get scraper class for product type."""
-    scrapers = {
-        ProductType.LIFE: LifeInsuranceScraper,
-        ProductType.LIFE_LIST: LifeProductListScraper,
-        ProductType.NONLIFE: NonLifeInsuranceScraper,
-        ProductType.HEALTH: HealthInsuranceScraper,
-    }
-    return scrapers[product_type]
-
-
-def load_existing_urls(csv_path: Path) -> set[str]:
-    """Load document URLs from existing CSV."""
-    urls = set()
-    if csv_path.exists():
-        with open(csv_path, newline="", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                url = row.get("document_url", "")
-                if url:
-                    urls.add(url)
-    return urls
+    return _SCRAPERS[product_type]
+
+
+def load_existing_urls(csv_path: Path) -> set[int]:
+    """Load hashed document URLs from existing CSV.
+
+    URLs are stored as 64-bit hashes (see url_key) rather than full strings,
+    which keeps the set small for large CSVs.
+    """
+    if not csv_path.exists():
+        return set()
+
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if not header or "document_url" not in header:
+            return set()
+        idx = header.index("document_url")
+        # Only one column is needed, so skip per-row dict construction
+        return {url_key(row[idx]) for row in reader if len(row) > idx and row[idx]}
+
+
+def find_new_products(products: list, existing_urls: set[int]) -> list:
+    """Return products whose document URL is not in existing_urls, in scrape order.
+
+    URL hashes are computed once into a list parallel to products, so the delta
+    is a single C-level set difference followed by a zip back onto the
+    products. Products without a document URL (key None) are always new.
+    """
+    keys = [url_key(p.document_url) if p.document_url else None for p in products]
+    new_keys = set(keys) - existing_urls
+    return [p for p, key in zip(products, keys) if key in new_keys]
 
 
 def get_csv_path(config: ScraperConfig, product_type: ProductType) -> Path:
     """Get CSV path for a product type."""
-    csv_names = {
-        ProductType.LIFE: "life_insurance_products.csv",
-        ProductType.LIFE_LIST: "life_products_list.csv",
-        ProductType.NONLIFE: "nonlife_insurance_products.csv",
-        ProductType.HEALTH: "health_insurance_products.csv",
-    }
-    return config.data_dir / "metadata" / csv_names[product_type]
+    return config.data_dir / "metadata" / _CSV_NAMES[product_type]
+
+
+def get_checkpoint_path(config: ScraperConfig, product_type: ProductType) -> Path:
+    """Get path of the sidecar recording files downloaded in an unfinished run.
+
+    It lives under data/cache (kept between CI runs, never committed) rather
+    than next to the CSVs in data/metadata.
+    """
+    return config.data_dir / "cache" / "checkpoints" / f"{product_type.value}.downloaded.jsonl"
+
+
+def load_checkpoint(checkpoint_path: Path) -> dict[str, dict]:
+    """Load {document_url: {"r2_url", "local"}} from a checkpoint sidecar."""
+    entries = {}
+    if checkpoint_path.exists():
+        with open(checkpoint_path, "rb") as f:
+            for line in f:
+                try:
+                    entry = orjson.loads(line)
+                except orjson.JSONDecodeError:
+                    continue  # truncated last line from a crash
+                entries[entry["url"]] = entry
+    return entries
 
 
 async def scrape_metadata(
@@ -67,10 +122,13 @@ async def scrape_metadata(
     product_type: ProductType,
     start_page: int | None = None,
     end_page: int | None = None,
-) -> list:
-    """Scrape metadata only (no downloads) for a product type."""
+) -> AsyncIterator[tuple[int, list]]:
+    """Scrape metadata (no downloads) for a product type, yielding (page, products).
+
+    Products whose document URL already appeared on an earlier page are dropped.
+    """
     scraper_class = get_scraper_class(product_type)
-    all_products = []
+    scraped_count = 0
 
     print(f"Scraping metadata for {product_type.value}...")
 
@@ -78,28 +136,40 @@ async def scrape_metadata(
         total_pages = await scraper.get_total_pages()
         actual_start = start_page or 1
         actual_end = end_page or total_pages
-        print(f"  Scraping pages {actual_start} to {actual_end} (of {total_pages} total)")
+        print(f"  [{product_type.value}] Scraping pages {actual_start} to {actual_end} (of {total_pages} total)")
 
+        # The same document can appear on more than one page; keep the first
+        seen: set[str] = set()
         async for page, products in scraper.scrape_all_pages(actual_start, actual_end):
-            if products:
-                all_products.extend(products)
-            print(f"  Page {page}/{actual_end} ({len(all_products)} products)")
+            unique = []
+            for product in products:
+                if product.document_url:
+                    if product.document_url in seen:
+                        continue
+                    seen.add(product.document_url)
+                unique.append(product)
+            scraped_count += len(unique)
+            print(f"  [{product_type.value}] Page {page}/{actual_end} ({scraped_count} products)")
+            yield page, unique
 
-    print(f"  Total: {len(all_products)} products")
-    return all_products
+    print(f"  [{product_type.value}] Total: {scraped_count} products")
 
 
 async def download_new_files(
     config: ScraperConfig,
     file_manager: FileManager,
+    downloader: AsyncFileDownloader,
     product_type: ProductType,
     new_products: list,
     storage: str,
-    concurrent: int = 10,
-    rate_limit: float = 10.0,
+    write_product: Callable[[InsuranceProduct], None],
     r2_uploader=None,
 ) -> list:
-    """Download files for new products and optionally upload to R2."""
+    """Download files for new products and optionally upload to R2.
+
+    Each product is passed to write_product as soon as its download (and
+    upload, if any) has finished.
+    """
     if not new_products:
         return new_products
 
@@ -107,108 +177,234 @@ async def download_new_files(
 
     # Create download tasks
     tasks = []
+    # Relative paths under the downloads root become R2 keys; a plain string
+    # prefix strip is cheaper than Path.relative_to per file
+    download_root = f"{config.data_dir / 'downloads' / product_type.value}{os.sep}"
     for product in new_products:
         if product.document_url:
-            task = file_manager.create_download_task(product, product_type)
+            # R2-only storage streams the response straight into R2
+            stream_to_r2 = storage == "r2" and r2_uploader is not None
+            task = file_manager.create_download_task(product, product_type, stream_to_r2)
             if task:
+                if stream_to_r2:
+                    rel_path = str(task.destination).removeprefix(download_root)
+                    task.r2_key = r2_uploader.generate_r2_key(product_type.value, rel_path)
                 tasks.append((product, task))
+                continue
+        write_product(product)
 
     if not tasks:
         return new_products
 
     # Download files
     download_tasks = [t[1] for t in tasks]
-    print(f"  Starting {len(download_tasks)} downloads (concurrent={concurrent}, rate={rate_limit}/s)...")
-
-    async with AsyncFileDownloader(config, max_concurrent=concurrent, rate_limit=rate_limit) as downloader:
-        results = await downloader.download_batch(
-            download_tasks,
-            progress_callback=lambda done, total, url: print(f"  [{done}/{total}] Downloaded") if done % 50 == 0 or done == total else None
-        )
+    print(f"  [{product_type.value}] Starting {len(download_tasks)} downloads...")
+
+    # The callback only records progress; a reporter task prints it
+    # periodically so stdout writes don't scale with the number of downloads
+    done_count = 0
+
+    def on_progress(done: int, total: int, url: str) -> None:
+        nonlocal done_count
+        done_count += 1
+
+    async def report_progress(total: int) -> None:
+        reported = 0
+        while True:
+            await asyncio.sleep(PROGRESS_INTERVAL)
+            if done_count != reported:
+                reported = done_count
+                print(f"  [{product_type.value}] [{reported}/{total}] Downloaded")
+
+    reporter = asyncio.create_task(report_progress(len(download_tasks)))
+    try:
+        results = await downloader.download_batch(download_tasks, progress_callback=on_progress)
+    finally:
+        reporter.cancel()
+    print(f"  [{product_type.value}] [{done_count}/{len(download_tasks)}] Downloaded")
 
     # Process results
-    url_to_result = {r.url: r for r in results}
     success_count = 0
     fail_count = 0
-    upload_count = 0
+    streamed_count = 0
+    to_upload = []
 
-    for product, task in tasks:
-        result = url_to_result.get(product.document_url)
-        if result and result.success and result.file_path and result.file_path.exists():
+    # download_batch returns results in task order
+    for (product, task), result in zip(tasks, results, strict=True):
+        if result.success and result.r2_url:
+            success_count += 1
+            streamed_count += 1
+            product.r2_url = result.r2_url
+        elif result.success and result.file_path:
             success_count += 1
             product.local_file_path = str(result.file_path)
-
-            # Upload to R2 if enabled
-            if storage in ("r2", "both") and r2_uploader:
-                try:
-                    rel_path = result.file_path.relative_to(
-                        config.data_dir / "downloads" / product_type.value
-                    )
-                    r2_key = r2_uploader.generate_r2_key(product_type.value, str(rel_path))
-                    r2_url = r2_uploader.upload_file(result.file_path, r2_key)
-                    product.r2_url = r2_url
-                    upload_count += 1
-
-                    # Delete local file if R2-only
-                    if storage == "r2":
-                        result.file_path.unlink(missing_ok=True)
-                        product.local_file_path = None
-                except Exception as e:
-                    print(f"  R2 upload failed for {product.document_url}: {e}")
+            if storage == "both" and r2_uploader:
+                to_upload.append((product, result.file_path))
+                continue
         else:
             fail_count += 1
-            if result and result.error:
-                print(f"  Download failed: {result.error[:100]}")
-
-    print(f"  Downloaded: {success_count}, Failed: {fail_count}, R2 uploaded: {upload_count}")
+            if result.error:
+                print(f"  [{product_type.value}] Download failed: {result.error[:100]}")
+        write_product(product)
+
+    # Upload local copies to R2 concurrently (storage "both"; boto3 is sync,
+    # so each upload runs in a thread)
+    upload_semaphore = asyncio.Semaphore(downloader.max_concurrent)
+
+    async def upload_one(product, file_path: Path) -> bool:
+        async with upload_semaphore:
+            try:
+                rel_path = str(file_path).removeprefix(download_root)
+                r2_key = r2_uploader.generate_r2_key(product_type.value, rel_path)
+                product.r2_url = await asyncio.to_thread(r2_uploader.upload_file, file_path, r2_key)
+                return True
+            except Exception as e:
+                print(f"  [{product_type.value}] R2 upload failed for {product.document_url}: {e}")
+                return False
+            finally:
+                write_product(product)
+
+    uploaded = await asyncio.gather(*(upload_one(p, fp) for p, fp in to_upload))
+    upload_count = streamed_count + sum(uploaded)
+
+    print(f"  [{product_type.value}] Downloaded: {success_count}, Failed: {fail_count}, R2 uploaded: {upload_count}")
     return new_products
 
 
+async def list_r2_keys(r2_uploader, product_type: ProductType) -> set[str] | None:
+    """List the keys under a product type's R2 prefix, or None if listing fails."""
+    from botocore.exceptions import BotoCoreError, ClientError
+
+    try:
+        return await asyncio.to_thread(r2_uploader.existing_keys, f"{product_type.value}/")
+    except (BotoCoreError, ClientError) as e:
+        print(f"  [{product_type.value}] Could not list R2 objects: {e}")
+        return None
+
+
 async def process_product_type(
     config: ScraperConfig,
     csv_writer: CSVWriter,
     file_manager: FileManager,
+    downloader: AsyncFileDownloader,
     product_type: ProductType,
     storage: str,
-    concurrent: int = 10,
-    rate_limit: float = 10.0,
     metadata_only: bool = False,
     start_page: int | None = None,
     end_page: int | None = None,
     r2_uploader=None,
 ) -> tuple[int, int]:
-    """Process a single product type: scrape, compare, download delta."""
+    """Process a single product type: scrape, compare, download delta.
+
+    Scraping and downloading run as a pipeline: each page's new products are
+    queued as soon as the page is parsed and downloaded in batches of
+    DOWNLOAD_BATCH_SIZE while later pages are still being scraped. The bounded
+    queue caps how far scraping can run ahead of downloads.
+    """
     csv_path = get_csv_path(config, product_type)
 
     # Load existing URLs
     existing_urls = load_existing_urls(csv_path)
     print(f"\n{product_type.value}: {len(existing_urls)} existing records")
 
-    # Scrape current metadata
-    current_products = await scrape_metadata(config, product_type, start_page, end_page)
+    # Files downloaded by an interrupted run are recorded in a checkpoint;
+    # reuse their locations instead of downloading them again
+    checkpoint_path = get_checkpoint_path(config, product_type)
+    checkpoint = load_checkpoint(checkpoint_path)
 
-    # Find new products
-    new_products = [p for p in current_products if p.document_url not in existing_urls]
-    print(f"  New products: {len(new_products)}")
+    # Checkpointed uploads are reused only if their object is still in R2.
+    # The checkpoint ties each object to its document URL; one listing of the
+    # prefix replaces a HEAD per entry. If listing fails, entries are trusted.
+    r2_keys: set[str] | None = None
+    if r2_uploader and not metadata_only and any(e["r2_url"] for e in checkpoint.values()):
+        r2_keys = await list_r2_keys(r2_uploader, product_type)
+    r2_url_prefix = r2_uploader.public_url("") if r2_uploader else ""
 
-    if not new_products:
-        print("  No new products to download")
-        return len(current_products), 0
-
-    # Download new files (unless metadata only)
+    if metadata_only:
+        print(f"  [{product_type.value}] Metadata only mode - skipping downloads")
+
+    queue: asyncio.Queue[list | None] = asyncio.Queue(maxsize=2 * downloader.max_concurrent)
+    scraped_count = 0
+    new_count = 0
+
+    async def produce() -> None:
+        nonlocal scraped_count
+        async for _, products in scrape_metadata(config, product_type, start_page, end_page):
+            scraped_count += len(products)
+            new_products = find_new_products(products, existing_urls)
+            if new_products:
+                await queue.put(new_products)
+        await queue.put(None)
+
+    # Only runs that download files record them in the checkpoint
     if not metadata_only:
-        new_products = await download_new_files(
-            config, file_manager, product_type, new_products, storage, concurrent, rate_limit, r2_uploader
-        )
-    else:
-        print("  Metadata only mode - skipping downloads")
-
-    # Append new products to CSV
-    if new_products:
-        csv_writer.write_products(new_products, product_type, append=True)
-        print(f"  Appended {len(new_products)} products to CSV")
-
-    return len(current_products), len(new_products)
+        checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+
+    # New products are appended to the CSV as soon as they are done so
+    # partial progress survives a crash
+    with (
+        csv_writer.append_session(product_type) as write_product,
+        open(checkpoint_path, "ab", buffering=0) if not metadata_only else nullcontext()
+        as checkpoint_file,
+    ):
+        def finish_product(product) -> None:
+            write_product(product)
+            if product.local_file_path or product.r2_url:
+                checkpoint_file.write(orjson.dumps({
+                    "url": product.document_url,
+                    "r2_url": product.r2_url,
+                    "local": product.local_file_path,
+                }) + b"\n")
+
+        async def handle_batch(new_products: list) -> None:
+            to_download = []
+            for product in new_products:
+                entry = checkpoint.get(product.document_url)
+                if entry and entry["r2_url"] and r2_keys is not None:
+                    if entry["r2_url"].removeprefix(r2_url_prefix) not in r2_keys:
+                        entry = None  # object gone from R2: download it again
+                if entry:
+                    product.r2_url = entry["r2_url"]
+                    product.local_file_path = entry["local"]
+                    write_product(product)
+                else:
+                    to_download.append(product)
+            resumed = len(new_products) - len(to_download)
+            if resumed:
+                print(f"  [{product_type.value}] Resumed {resumed} downloads from checkpoint")
+
+            if not metadata_only:
+                await download_new_files(
+                    config, file_manager, downloader, product_type, to_download, storage,
+                    finish_product, r2_uploader
+                )
+            else:
+                for product in to_download:
+                    write_product(product)
+
+        async def consume() -> None:
+            nonlocal new_count
+            batch: list = []
+            while (new_products := await queue.get()) is not None:
+                batch.extend(new_products)
+                if len(batch) >= DOWNLOAD_BATCH_SIZE:
+                    await handle_batch(batch)
+                    new_count += len(batch)
+                    batch = []
+            if batch:
+                await handle_batch(batch)
+                new_count += len(batch)
+
+        async with asyncio.TaskGroup() as tg:
+            tg.create_task(produce())
+            tg.create_task(consume())
+
+    # Every new product is now in the CSV, so the checkpoint is no longer needed
+    checkpoint_path.unlink(missing_ok=True)
+    print(f"  [{product_type.value}] New products: {new_count}")
+    print(f"  [{product_type.value}] Appended {new_count} products to CSV")
+
+    return scraped_count, new_count
 
 
 async def main(
@@ -262,22 +458,35 @@ async def main(
             print("Valid options: life, life_list, nonlife, health, all")
             return
 
-    # Process each product type
+    # Process all product types concurrently (independent pages and CSV files).
+    # A single downloader is shared so its connection pool, concurrency limit
+    # and rate limit apply across all product types.
     total_products = 0
     total_new = 0
 
-    for product_type in types_to_process:
-        try:
-            products, new = await process_product_type(
-                config, csv_writer, file_manager, product_type, storage,
-                concurrent, rate_limit, metadata_only, start_page, end_page, r2_uploader
-            )
-            total_products += products
-            total_new += new
-        except Exception as e:
-            print(f"Error processing {product_type.value}: {e}")
+    async with AsyncFileDownloader(
+        config, max_concurrent=concurrent, rate_limit=rate_limit, r2_uploader=r2_uploader
+    ) as downloader:
+        results = await asyncio.gather(
+            *(
+                process_product_type(
+                    config, csv_writer, file_manager, downloader, product_type, storage,
+                    metadata_only, start_page, end_page, r2_uploader
+                )
+                for product_type in types_to_process
+            ),
+            return_exceptions=True,
+        )
+
+    for product_type, result in zip(types_to_process, results):
+        if isinstance(result, Exception):
+            print(f"Error processing {product_type.value}: {result}")
             import traceback
-            traceback.print_exc()
+            traceback.print_exception(result)
+            continue
+        products, new = result
+        total_products += products
+        total_new += new
 
     # Summary
     print("\n" + "=" * 40)
@@ -332,7 +541,7 @@ if __name__ == "__main__":
     )
     args = parser.parse_args()
 
-    asyncio.run(main(
+    run_async(main(
         storage=args.storage,
         product_type_filter=args.product_type,
         concurrent=args.concurrent,
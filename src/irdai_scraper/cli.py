@@ -1,9 +1,10 @@
 """CLI interface for IRDAI scraper."""
 
 import asyncio
+import hashlib
 import os
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional
 
 import typer
 from rich.console import Console
@@ -13,12 +14,14 @@ from rich.table import Table
 from .config import PAGE_CONFIGS, ProductType, ScraperConfig
 from .downloader.async_downloader import AsyncFileDownloader
 from .downloader.file_manager import FileManager
+from .models import DownloadTask
 from .scraper.health import HealthInsuranceScraper
 from .scraper.life import LifeInsuranceScraper
 from .scraper.life_list import LifeProductListScraper
 from .scraper.nonlife import NonLifeInsuranceScraper
 from .storage.csv_writer import CSVWriter
 from .storage.state import StateManager
+from .utils import run_async, url_key
 
 app = typer.Typer(name="irdai-scraper", help="IRDAI Insurance Products Scraper")
 
@@ -37,15 +40,97 @@ STORAGE_R2 = "r2"
 STORAGE_BOTH = "both"
 
 
+_SCRAPER_CLASSES = {
+    ProductType.LIFE: LifeInsuranceScraper,
+    ProductType.LIFE_LIST: LifeProductListScraper,
+    ProductType.NONLIFE: NonLifeInsuranceScraper,
+    ProductType.HEALTH: HealthInsuranceScraper,
+}
+
+
 def get_scraper_class(product_type: ProductType):
     """Get scraper class for product type."""
-    scrapers = {
-        ProductType.LIFE: LifeInsuranceScraper,
-        ProductType.LIFE_LIST: LifeProductListScraper,
-        ProductType.NONLIFE: NonLifeInsuranceScraper,
-        ProductType.HEALTH: HealthInsuranceScraper,
-    }
-    return scrapers[product_type]
+    return _SCRAPER_CLASSES[product_type]
+
+
+async def download_products(
+    products: list,
+    product_type: ProductType,
+    config: ScraperConfig,
+    state_manager: StateManager,
+    file_manager: FileManager,
+    downloader: AsyncFileDownloader,
+    completed: set[int],
+    storage: str = STORAGE_FILESYSTEM,
+    r2_uploader=None,
+) -> tuple[int, int]:
+    """Download documents for a page of products, updating them in place.
+
+    Results are handled as each download finishes, so R2 uploads and state
+    updates overlap with downloads still in flight. completed holds the
+    url_key hashes of already-downloaded URLs; new downloads are added to it.
+
+    Returns:
+        Tuple of (files_downloaded, files_failed)
+    """
+    files_downloaded = 0
+    files_failed = 0
+
+    tasks = []
+    for product in products:
+        if product.document_url and url_key(product.document_url) not in completed:
+            task = file_manager.create_download_task(product, product_type)
+            if task:
+                tasks.append(task)
+
+    url_to_product = {p.document_url: p for p in products if p.document_url}
+
+    # boto3 is sync, so uploads run in threads, overlapping with downloads
+    upload_semaphore = asyncio.Semaphore(downloader.max_concurrent)
+    pt_root = config.data_dir / "downloads" / product_type.value
+    uploads = []
+
+    async def upload_one(product, file_path: Path) -> None:
+        async with upload_semaphore:
+            try:
+                # Generate R2 key from relative path
+                rel_path = file_path.relative_to(pt_root)
+                r2_key = r2_uploader.generate_r2_key(product_type.value, str(rel_path))
+                product.r2_url = await asyncio.to_thread(
+                    r2_uploader.upload_file, file_path, r2_key
+                )
+
+                # Delete local file if R2-only storage
+                if storage == STORAGE_R2:
+                    file_path.unlink(missing_ok=True)
+                    product.local_file_path = None
+            except Exception as e:
+                console.print(f"[red]R2 upload failed: {e}[/red]")
+
+    async for _, result in downloader.download_as_completed(tasks):
+        if result.success:
+            completed.add(url_key(result.url))
+            state_manager.mark_download_completed(result.url)
+            files_downloaded += 1
+            # Update product with local file path and/or R2 URL
+            product = url_to_product.get(result.url)
+            if product and result.file_path:
+                # Set local path if using filesystem storage
+                if storage in (STORAGE_FILESYSTEM, STORAGE_BOTH):
+                    product.local_file_path = str(result.file_path)
+
+                # Upload to R2 if using R2 storage
+                if storage in (STORAGE_R2, STORAGE_BOTH) and r2_uploader:
+                    uploads.append(
+                        asyncio.create_task(upload_one(product, result.file_path))
+                    )
+        else:
+            state_manager.mark_download_failed(result.url, result.error or "Unknown error")
+            files_failed += 1
+
+    await asyncio.gather(*uploads)
+
+    return files_downloaded, files_failed
 
 
 async def scrape_product_type(
@@ -76,6 +161,9 @@ async def scrape_product_type(
     session = state_manager.start_session(product_type)
     resume_page = start_page or (session.last_completed_page + 1)
 
+    # Local snapshot for fast membership tests across all pages
+    completed = state_manager.get_completed_downloads()
+
     if IS_CI:
         print(f"\nScraping {product_type.value}...")
         if resume_page > 1:
@@ -85,147 +173,93 @@ async def scrape_product_type(
         if resume_page > 1:
             console.print(f"[yellow]Resuming from page {resume_page}[/yellow]")
 
-    async with scraper_class(config) as scraper:
-        total_pages = end_page or await scraper.get_total_pages()
-
-        if IS_CI:
-            # Simple progress for CI
-            print(f"Total pages: {total_pages}")
-            async for page, products in scraper.scrape_all_pages(resume_page, total_pages):
-                if products:
-                    # Download files if not metadata only
-                    if not metadata_only:
-                        tasks = []
-                        url_to_task: dict[str, any] = {}
-                        for product in products:
-                            if product.document_url and not state_manager.is_download_completed(
-                                product.document_url
-                            ):
-                                task = file_manager.create_download_task(product, product_type)
-                                if task:
-                                    tasks.append(task)
-                                    url_to_task[product.document_url] = task
-
-                        if tasks:
-                            async with AsyncFileDownloader(
-                                config, max_concurrent=concurrent_downloads, rate_limit=rate_limit
-                            ) as downloader:
-                                results = await downloader.download_batch(tasks)
-
-                                for result in results:
-                                    if result.success:
-                                        state_manager.mark_download_completed(result.url)
-                                        files_downloaded += 1
-                                        for product in products:
-                                            if product.document_url == result.url and result.file_path:
-                                                if storage in (STORAGE_FILESYSTEM, STORAGE_BOTH):
-                                                    product.local_file_path = str(result.file_path)
-                                                if storage in (STORAGE_R2, STORAGE_BOTH) and r2_uploader:
-                                                    try:
-                                                        rel_path = result.file_path.relative_to(
-                                                            config.data_dir / "downloads" / product_type.value
-                                                        )
-                                                        r2_key = r2_uploader.generate_r2_key(
-                                                            product_type.value, str(rel_path)
-                                                        )
-                                                        r2_url = r2_uploader.upload_file(result.file_path, r2_key)
-                                                        product.r2_url = r2_url
-                                                        if storage == STORAGE_R2:
-                                                            result.file_path.unlink(missing_ok=True)
-                                                            product.local_file_path = None
-                                                    except Exception as e:
-                                                        print(f"R2 upload failed: {e}")
-                                                break
-                                    else:
-                                        state_manager.mark_download_failed(
-                                            result.url, result.error or "Unknown error"
-                                        )
-                                        files_failed += 1
-
-                    csv_writer.write_products(products, product_type, append=True)
-                    products_scraped += len(products)
-
-                state_manager.update_page_progress(product_type, page)
-                print(f"  Page {page}/{total_pages} - {products_scraped} products, {files_downloaded} downloads")
-        else:
-            # Rich progress for interactive terminal
-            with Progress(
-                SpinnerColumn(),
-                TextColumn("[progress.description]{task.description}"),
-                BarColumn(),
-                TaskProgressColumn(),
-                console=console,
-            ) as progress:
-                page_task = progress.add_task(
-                    f"[cyan]Pages ({product_type.value})",
-                    total=total_pages - resume_page + 1,
-                )
+    async def process_page(
+        products: list, downloader: AsyncFileDownloader, write_product
+    ) -> None:
+        nonlocal products_scraped, files_downloaded, files_failed
 
-                async for page, products in scraper.scrape_all_pages(resume_page, total_pages):
-                    if products:
-                        # Download files if not metadata only
-                        if not metadata_only:
-                            tasks = []
-                            url_to_task: dict[str, any] = {}
-                            for product in products:
-                                if product.document_url and not state_manager.is_download_completed(
-                                    product.document_url
-                                ):
-                                    task = file_manager.create_download_task(product, product_type)
-                                    if task:
-                                        tasks.append(task)
-                                        url_to_task[product.document_url] = task
-
-                            if tasks:
-                                async with AsyncFileDownloader(
-                                    config, max_concurrent=concurrent_downloads, rate_limit=rate_limit
-                                ) as downloader:
-                                    results = await downloader.download_batch(tasks)
-
-                                    for result in results:
-                                        if result.success:
-                                            state_manager.mark_download_completed(result.url)
-                                            files_downloaded += 1
-                                            # Update product with local file path and/or R2 URL
-                                            for product in products:
-                                                if product.document_url == result.url and result.file_path:
-                                                    # Set local path if using filesystem storage
-                                                    if storage in (STORAGE_FILESYSTEM, STORAGE_BOTH):
-                                                        product.local_file_path = str(result.file_path)
-
-                                                    # Upload to R2 if using R2 storage
-                                                    if storage in (STORAGE_R2, STORAGE_BOTH) and r2_uploader:
-                                                        try:
-                                                            # Generate R2 key from relative path
-                                                            rel_path = result.file_path.relative_to(
-                                                                config.data_dir / "downloads" / product_type.value
-                                                            )
-                                                            r2_key = r2_uploader.generate_r2_key(
-                                                                product_type.value, str(rel_path)
-                                                            )
-                                                            r2_url = r2_uploader.upload_file(result.file_path, r2_key)
-                                                            product.r2_url = r2_url
-
-                                                            # Delete local file if R2-only storage
-                                                            if storage == STORAGE_R2:
-                                                                result.file_path.unlink(missing_ok=True)
-                                                                product.local_file_path = None
-                                                        except Exception as e:
-                                                            console.print(f"[red]R2 upload failed: {e}[/red]")
-                                                    break
-                                        else:
-                                            state_manager.mark_download_failed(
-                                                result.url, result.error or "Unknown error"
-                                            )
-                                            files_failed += 1
-
-                        # Write to CSV (after downloads so local_file_path is set)
-                        csv_writer.write_products(products, product_type, append=True)
-                        products_scraped += len(products)
-
-                    # Update progress
-                    state_manager.update_page_progress(product_type, page)
-                    progress.advance(page_task)
+        # Download files if not metadata only
+        if not metadata_only:
+            downloaded, failed = await download_products(
+                products,
+                product_type,
+                config,
+                state_manager,
+                file_manager,
+                downloader,
+                completed,
+                storage,
+                r2_uploader,
+            )
+            files_downloaded += downloaded
+            files_failed += failed
+
+        # Write to CSV (after downloads so local_file_path is set), flushing
+        # before the page is recorded as done so a resume never skips rows
+        for product in products:
+            write_product(product)
+        write_product.flush()
+        products_scraped += len(products)
+
+    # One downloader and one open CSV for all pages
+    async with (
+        scraper_class(config) as scraper,
+        AsyncFileDownloader(
+            config, max_concurrent=concurrent_downloads, rate_limit=rate_limit
+        ) as downloader,
+    ):
+        with csv_writer.append_session(product_type) as write_product:
+            total_pages = end_page or await scraper.get_total_pages()
+
+            async def run_pages(on_page_done: Callable[[int], None]) -> None:
+                # Scrape the next page while this page's files download; the
+                # queue holds at most one page ahead of the downloads
+                queue: asyncio.Queue[tuple[int, list] | None] = asyncio.Queue(maxsize=2)
+
+                async def produce() -> None:
+                    async for page, products in scraper.scrape_all_pages(
+                        resume_page, total_pages
+                    ):
+                        await queue.put((page, products))
+                    await queue.put(None)
+
+                async def consume() -> None:
+                    while (item := await queue.get()) is not None:
+                        page, products = item
+                        if products:
+                            await process_page(products, downloader, write_product)
+
+                        state_manager.update_page_progress(product_type, page)
+                        state_manager.flush_if_dirty()
+                        on_page_done(page)
+
+                async with asyncio.TaskGroup() as tg:
+                    tg.create_task(produce())
+                    tg.create_task(consume())
+
+            if IS_CI:
+                # Simple progress for CI
+                print(f"Total pages: {total_pages}")
+                await run_pages(
+                    lambda page: print(
+                        f"  Page {page}/{total_pages} - {products_scraped} products, {files_downloaded} downloads"
+                    )
+                )
+            else:
+                # Rich progress for interactive terminal
+                with Progress(
+                    SpinnerColumn(),
+                    TextColumn("[progress.description]{task.description}"),
+                    BarColumn(),
+                    TaskProgressColumn(),
+                    console=console,
+                ) as progress:
+                    page_task = progress.add_task(
+                        f"[cyan]Pages ({product_type.value})",
+                        total=total_pages - resume_page + 1,
+                    )
+
+                    await run_pages(lambda page: progress.advance(page_task))
 
     # Mark session complete
     state_manager.complete_session(product_type, products_scraped)
@@ -286,6 +320,11 @@ def scrape(
         "-s",
         help="Storage backend: filesystem, r2, or both",
     ),
+    revalidate: bool = typer.Option(
+        False,
+        "--revalidate",
+        help="Re-check existing files with the server (conditional GET) instead of skipping them",
+    ),
 ):
     """Scrape IRDAI insurance products."""
     console.print("[bold]IRDAI Insurance Products Scraper[/bold]")
@@ -297,7 +336,7 @@ def scrape(
         console.print("Valid options: filesystem, r2, both")
         raise typer.Exit(1)
 
-    config = ScraperConfig(data_dir=output_dir)
+    config = ScraperConfig(data_dir=output_dir, skip_existing=not revalidate)
     state_manager = StateManager(config)
     csv_writer = CSVWriter(config)
     file_manager = FileManager(config)
@@ -359,7 +398,11 @@ def scrape(
             total_downloaded += downloaded
             total_failed += failed
 
-    asyncio.run(run_scraping())
+    try:
+        run_async(run_scraping())
+    finally:
+        # Keep progress recorded since the last flush, even on errors
+        state_manager.flush()
 
     # Print summary
     if IS_CI:
@@ -436,29 +479,39 @@ def retry_failed():
             with Progress(console=console) as progress:
                 task = progress.add_task("[cyan]Retrying...", total=len(failed))
 
+                retry_tasks = []
                 for fd in failed:
-                    # Create a simple download task
-                    from .models import DownloadTask
-
-                    # Try to determine destination from URL
+                    # Name by a stable hash of the URL, so reruns reuse earlier retries
                     ext = file_manager.extract_extension_from_url(fd.url)
-                    dest = config.data_dir / "downloads" / "retry" / f"file_{hash(fd.url)}{ext}"
-
-                    result = await downloader.download_file(fd.url, dest)
+                    key = hashlib.sha1(fd.url.encode()).hexdigest()[:16]
+                    dest = config.data_dir / "downloads" / "retry" / f"file_{key}{ext}"
 
-                    if result.success:
+                    if dest.exists():
                         state_manager.mark_download_completed(fd.url)
                         state_manager.clear_failed_download(fd.url)
                         success_count += 1
+                        progress.advance(task)
+                    else:
+                        retry_tasks.append(
+                            DownloadTask(url=fd.url, destination=dest, product_type="retry")
+                        )
+
+                # Retry concurrently (the downloader's semaphore bounds concurrency)
+                async for retry_task, result in downloader.download_as_completed(retry_tasks):
+                    if result.success:
+                        state_manager.mark_download_completed(retry_task.url)
+                        state_manager.clear_failed_download(retry_task.url)
+                        success_count += 1
                     else:
                         fail_count += 1
 
                     progress.advance(task)
 
+            state_manager.flush()
             console.print(f"\n[green]Successful: {success_count}[/green]")
             console.print(f"[red]Still failing: {fail_count}[/red]")
 
-    asyncio.run(do_retry())
+    run_async(do_retry())
 
 
 @app.command()
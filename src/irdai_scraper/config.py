@@ -26,18 +26,27 @@ class PageConfig:
 
 @dataclass
 class ScraperConfig:
-    """Global scraper configuration."""
+    """Global scraper configuration.
+
+    skip_existing decides what happens to documents already on disk: when
+    True (the default) a non-empty local file is kept without any request.
+    Set it to False to revalidate existing files instead, with a conditional
+    GET built from the file's saved ETag and mtime (a 304 keeps the copy).
+    """
 
     base_url: str = "https://irdai.gov.in"
     items_per_page: int = 60  # Maximum allowed by Liferay
     max_concurrent_downloads: int = 10
     max_concurrent_pages: int = 5
+    max_connections_per_host: int = 10  # sockets to irdai.gov.in before resets
     download_timeout: int = 300  # 5 minutes per file
     page_timeout: int = 60
     retry_attempts: int = 3
     retry_delay: float = 2.0
     rate_limit: float = 10.0  # requests per second (0 = no limit)
     verify_ssl: bool = False  # IRDAI has certificate issues
+    page_cache: bool = True  # conditional GETs for listing pages (data_dir/cache)
+    skip_existing: bool = True  # keep local files as is (False = revalidate via ETag)
     data_dir: Path = field(default_factory=lambda: Path("data"))
     user_agent: str = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
 
@@ -1,12 +1,29 @@
 """File naming and path management for downloads."""
 
+import os
 import re
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 from urllib.parse import unquote, urlparse
 
 from ..config import ProductType, ScraperConfig
-from ..models import DownloadTask, InsuranceProduct
+from ..models import (
+    DownloadTask,
+    HealthInsuranceProduct,
+    InsuranceProduct,
+    LifeInsuranceProduct,
+    LifeProductListItem,
+    NonLifeInsuranceProduct,
+)
+
+# Extended attribute holding the ETag of a downloaded file
+ETAG_XATTR = "user.irdai.etag"
+
+_INVALID_RE = re.compile(r'[<>:"/\\|?*]')
+_DASHSPACE_RE = re.compile(r"[-\s]+")
+
+_EXTENSIONS = (".pdf", ".xlsx", ".xls")
 
 
 class FileManager:
@@ -15,32 +32,60 @@ class FileManager:
     def __init__(self, config: ScraperConfig):
         self.config = config
         self.downloads_dir = config.data_dir / "downloads"
+        self._path_builders = {
+            ProductType.LIFE: self._get_life_path,
+            ProductType.LIFE_LIST: self._get_life_list_path,
+            ProductType.NONLIFE: self._get_nonlife_path,
+            ProductType.HEALTH: self._get_health_path,
+        }
 
     @staticmethod
+    @lru_cache(maxsize=4096)  # insurer and financial year repeat across products
     def sanitize_filename(name: str, max_length: int = 100) -> str:
         """Sanitize a string for use as filename."""
         # Remove or replace invalid characters
-        name = re.sub(r'[<>:"/\\|?*]', "-", name)
+        name = _INVALID_RE.sub("-", name)
         # Normalize whitespace and dashes
-        name = re.sub(r"[-\s]+", "-", name)
+        name = _DASHSPACE_RE.sub("-", name)
         # Remove leading/trailing dashes and spaces
         name = name.strip("- ")
         # Truncate if too long
         return name[:max_length] if name else "unknown"
 
+    @staticmethod
+    def read_etag(path: Path) -> Optional[str]:
+        """Read the ETag stored on a downloaded file, if any."""
+        try:
+            return os.getxattr(path, ETAG_XATTR).decode()
+        except (AttributeError, OSError):
+            # No xattr support (non-Linux or filesystem) or no ETag stored
+            return None
+
+    @staticmethod
+    def write_etag(path: Path, etag: str) -> None:
+        """Store the server ETag on a downloaded file for conditional re-fetches."""
+        try:
+            os.setxattr(path, ETAG_XATTR, etag.encode())
+        except (AttributeError, OSError):
+            pass
+
     @staticmethod
     def extract_extension_from_url(url: str) -> str:
         """Extract file extension from URL."""
-        parsed = urlparse(url)
-        path = unquote(parsed.path)
+        path = unquote(urlparse(url).path).lower()
+
+        # Fast path: path ends in a known extension
+        for ext in _EXTENSIONS:
+            if path.endswith(ext):
+                return ext
 
         # Look for common extensions
-        for ext in [".pdf", ".xlsx", ".xls"]:
-            if ext in path.lower():
+        for ext in _EXTENSIONS:
+            if ext in path:
                 return ext
 
         # Default based on URL content
-        if "xlsx" in url.lower() or "xls" in url.lower():
+        if "xls" in url.lower():
             return ".xlsx"
         return ".pdf"
 
@@ -53,35 +98,27 @@ class FileManager:
         if not product.document_url:
             return None
 
+        # Build path based on product type
+        builder = self._path_builders.get(product_type)
+        if builder is None:
+            return None
+
         ext = self.extract_extension_from_url(product.document_url)
+        return builder(product, ext)
 
-        # Build path based on product type
-        if product_type == ProductType.LIFE:
-            return self._get_life_path(product, ext)
-        elif product_type == ProductType.LIFE_LIST:
-            return self._get_life_list_path(product, ext)
-        elif product_type == ProductType.NONLIFE:
-            return self._get_nonlife_path(product, ext)
-        elif product_type == ProductType.HEALTH:
-            return self._get_health_path(product, ext)
-
-        return None
-
-    def _get_life_path(self, product: InsuranceProduct, ext: str) -> Path:
+    def _get_life_path(self, product: LifeInsuranceProduct, ext: str) -> Path:
         """Get download path for life insurance product."""
-        fy = self.sanitize_filename(getattr(product, "financial_year", "") or "unknown-fy")
-        insurer = self.sanitize_filename(getattr(product, "insurer", "") or "unknown-insurer")
-        uin = self.sanitize_filename(getattr(product, "uin", "") or "unknown")
-        product_name = self.sanitize_filename(getattr(product, "product_name", "") or "product")
+        fy = self.sanitize_filename(product.financial_year or "unknown-fy")
+        insurer = self.sanitize_filename(product.insurer or "unknown-insurer")
+        uin = self.sanitize_filename(product.uin or "unknown")
+        product_name = self.sanitize_filename(product.product_name or "product")
 
         filename = f"{uin}_{product_name}{ext}"
         return self.downloads_dir / "life" / fy / insurer / filename
 
-    def _get_life_list_path(self, product: InsuranceProduct, ext: str) -> Path:
+    def _get_life_list_path(self, product: LifeProductListItem, ext: str) -> Path:
         """Get download path for life products list item."""
-        desc = self.sanitize_filename(
-            getattr(product, "short_description", "") or "unknown"
-        )
+        desc = self.sanitize_filename(product.short_description or "unknown")
 
         # Use original filename if available
         if product.document_filename:
@@ -93,22 +130,22 @@ class FileManager:
 
         return self.downloads_dir / "life_list" / filename
 
-    def _get_nonlife_path(self, product: InsuranceProduct, ext: str) -> Path:
+    def _get_nonlife_path(self, product: NonLifeInsuranceProduct, ext: str) -> Path:
         """Get download path for non-life insurance product."""
-        fy = self.sanitize_filename(getattr(product, "financial_year", "") or "unknown-fy")
-        insurer = self.sanitize_filename(getattr(product, "insurer", "") or "unknown-insurer")
-        uin = self.sanitize_filename(getattr(product, "uin", "") or "unknown")
-        product_name = self.sanitize_filename(getattr(product, "product_name", "") or "product")
+        fy = self.sanitize_filename(product.financial_year or "unknown-fy")
+        insurer = self.sanitize_filename(product.insurer or "unknown-insurer")
+        uin = self.sanitize_filename(product.uin or "unknown")
+        product_name = self.sanitize_filename(product.product_name or "product")
 
         filename = f"{uin}_{product_name}{ext}"
         return self.downloads_dir / "nonlife" / fy / insurer / filename
 
-    def _get_health_path(self, product: InsuranceProduct, ext: str) -> Path:
+    def _get_health_path(self, product: HealthInsuranceProduct, ext: str) -> Path:
         """Get download path for health insurance product."""
-        fy = self.sanitize_filename(getattr(product, "financial_year", "") or "unknown-fy")
-        insurer = self.sanitize_filename(getattr(product, "insurer", "") or "unknown-insurer")
-        uin = self.sanitize_filename(getattr(product, "uin", "") or "unknown")
-        product_name = self.sanitize_filename(getattr(product, "product_name", "") or "product")
+        fy = self.sanitize_filename(product.financial_year or "unknown-fy")
+        insurer = self.sanitize_filename(product.insurer or "unknown-insurer")
+        uin = self.sanitize_filename(product.uin or "unknown")
+        product_name = self.sanitize_filename(product.product_name or "product")
 
         filename = f"{uin}_{product_name}{ext}"
         return self.downloads_dir / "health" / fy / insurer / filename
@@ -117,8 +154,14 @@ class FileManager:
         self,
         product: InsuranceProduct,
         product_type: ProductType,
+        stream_to_r2: bool = False,
     ) -> Optional[DownloadTask]:
-        """Create a download task for a product."""
+        """Create a download task for a product.
+
+        The local copy's mtime and ETag are only read when the downloader will
+        revalidate it: not with config.skip_existing (existing files are kept
+        as is) and not for stream_to_r2 tasks, which never touch the local file.
+        """
         if not product.document_url:
             return None
 
@@ -126,9 +169,20 @@ class FileManager:
         if not destination:
             return None
 
-        return DownloadTask(
+        task = DownloadTask(
             url=product.document_url,
             destination=destination,
             product_type=product_type.value,
             uin=getattr(product, "uin", None),
         )
+
+        # An existing copy lets the downloader send a conditional GET
+        if not self.config.skip_existing and not stream_to_r2:
+            try:
+                task.local_mtime = destination.stat().st_mtime
+            except FileNotFoundError:
+                pass
+            else:
+                task.local_etag = self.read_etag(destination)
+
+        return task
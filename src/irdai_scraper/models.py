@@ -1,10 +1,13 @@
 """Data models for IRDAI scraper."""
 
+from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel
+
+from .utils import utcnow
 
 
 class InsuranceProduct(BaseModel):
@@ -16,7 +19,7 @@ class InsuranceProduct(BaseModel):
     document_filename: Optional[str] = None
     local_file_path: Optional[str] = None
     r2_url: Optional[str] = None
-    scraped_at: datetime = Field(default_factory=datetime.utcnow)
+    scraped_at: datetime  # set once per page by BaseScraper.parse_table
 
 
 class LifeInsuranceProduct(InsuranceProduct):
@@ -66,30 +69,38 @@ class HealthInsuranceProduct(InsuranceProduct):
     type_of_product: str = ""
 
 
-class DownloadTask(BaseModel):
+@dataclass(slots=True)
+class DownloadTask:
     """Represents a file download task."""
 
     url: str
     destination: Path
     product_type: str
     uin: Optional[str] = None
+    r2_key: Optional[str] = None  # stream straight to R2 instead of destination
+    local_etag: Optional[str] = None  # validators of an existing copy at destination
+    local_mtime: Optional[float] = None
     retries: int = 0
     status: str = "pending"  # pending, downloading, completed, failed
     error_message: Optional[str] = None
     file_size: Optional[int] = None
 
 
-class DownloadResult(BaseModel):
+@dataclass(slots=True)
+class DownloadResult:
     """Result of a download operation."""
 
     url: str
     success: bool
     file_path: Optional[Path] = None
     file_size: Optional[int] = None
+    r2_url: Optional[str] = None
+    skipped: bool = False  # server reported the existing local copy unchanged
     error: Optional[str] = None
 
 
-class SessionState(BaseModel):
+@dataclass(slots=True)
+class SessionState:
     """State for a single scraping session."""
 
     last_completed_page: int = 0
@@ -99,19 +110,21 @@ class SessionState(BaseModel):
     completed_at: Optional[datetime] = None
 
 
-class FailedDownload(BaseModel):
+@dataclass(slots=True)
+class FailedDownload:
     """Record of a failed download for retry."""
 
     url: str
     error: str
     retries: int = 0
-    last_attempt: datetime = Field(default_factory=datetime.utcnow)
+    last_attempt: datetime = field(default_factory=utcnow)
 
 
-class ScraperState(BaseModel):
+@dataclass(slots=True)
+class ScraperState:
     """Overall scraper state for resume capability."""
 
-    sessions: dict[str, SessionState] = Field(default_factory=dict)
-    completed_downloads: set[str] = Field(default_factory=set)
-    failed_downloads: list[FailedDownload] = Field(default_factory=list)
-    last_updated: datetime = Field(default_factory=datetime.utcnow)
+    sessions: dict[str, SessionState] = field(default_factory=dict)
+    completed_downloads: set[int] = field(default_factory=set)  # url_key hashes
+    failed_downloads: dict[str, FailedDownload] = field(default_factory=dict)  # by URL
+    last_updated: datetime = field(default_factory=utcnow)
@@ -1,33 +1,74 @@
 """Abstract base class for all product scrapers."""
 
+import asyncio
+import re
 from abc import ABC, abstractmethod
+from collections import deque
+from datetime import datetime
+from functools import lru_cache
 from typing import AsyncIterator, Optional
 
 import httpx
-from bs4 import BeautifulSoup
+import lxml.html
+from lxml.html import HtmlElement
 from rich.console import Console
 
 from ..config import PageConfig, ScraperConfig
 from ..models import InsuranceProduct
+from ..storage.page_cache import PageCache
+from ..utils import utcnow
 from .parser import LiferayTableParser
 
 console = Console()
 
+_PAGE_PARAM_RE = re.compile(r"_cur=(\d+)")
+
+
+@lru_cache(maxsize=None)
+def _html_parser(encoding: str) -> lxml.html.HTMLParser:
+    """Get an HTML parser that decodes raw page bytes as encoding."""
+    return lxml.html.HTMLParser(encoding=encoding)
+
+
+def _parse_page(body: bytes, encoding: str) -> HtmlElement:
+    """Parse a page body, letting lxml decode raw bytes itself."""
+    return lxml.html.fromstring(body, parser=_html_parser(encoding))
+
 
 class BaseScraper(ABC):
     """Abstract base class for all product scrapers."""
 
+    # Rows with fewer cells are placeholders and are skipped before parse_row
+    MIN_CELLS = 1
+
     def __init__(self, config: ScraperConfig, page_config: PageConfig):
         self.config = config
         self.page_config = page_config
         self.parser = LiferayTableParser(config.base_url)
         self.client: Optional[httpx.AsyncClient] = None
         self._total_pages: Optional[int] = None
+        # Only the page number varies between page URLs
+        portlet_id = config.PORTLET_ID
+        self._page_url_prefix = (
+            f"{config.base_url}{page_config.url_path}?p_p_id={portlet_id}&_{portlet_id}_cur="
+        )
+        self._page_url_suffix = f"&_{portlet_id}_delta={config.items_per_page}"
+        self.page_cache: Optional[PageCache] = PageCache(config) if config.page_cache else None
 
     async def __aenter__(self):
+        # One long-lived client per scrape: its keep-alive pool reuses the
+        # TCP/TLS connections to the listing host across all pages, and HTTP/2
+        # multiplexes the concurrent page fetches (falls back to HTTP/1.1)
+        max_connections = self.config.max_concurrent_pages
         self.client = httpx.AsyncClient(
+            http2=True,
             verify=self.config.verify_ssl,
             timeout=httpx.Timeout(self.config.page_timeout),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=75,
+            ),
             headers={"User-Agent": self.config.user_agent},
             follow_redirects=True,
         )
@@ -36,74 +77,98 @@ class BaseScraper(ABC):
     async def __aexit__(self, *args):
         if self.client:
             await self.client.aclose()
+        if self.page_cache:
+            self.page_cache.close()
 
     def build_page_url(self, page: int) -> str:
         """Build URL for a specific page number."""
-        portlet_id = self.config.PORTLET_ID
-        params = [
-            f"p_p_id={portlet_id}",
-            f"_{portlet_id}_cur={page}",
-            f"_{portlet_id}_delta={self.config.items_per_page}",
-        ]
-        query = "&".join(params)
-        return f"{self.config.base_url}{self.page_config.url_path}?{query}"
-
-    async def fetch_page(self, page: int) -> BeautifulSoup:
-        """Fetch and parse a single page."""
+        return f"{self._page_url_prefix}{page}{self._page_url_suffix}"
+
+    async def fetch_page(self, page: int) -> HtmlElement:
+        """Fetch and parse a single page.
+
+        When the page cache is enabled, a conditional GET is sent and the
+        cached body is reused on 304 Not Modified.
+        """
         url = self.build_page_url(page)
-        response = await self.client.get(url)
+        headers = self.page_cache.conditional_headers(url) if self.page_cache else {}
+        response = await self.client.get(url, headers=headers)
+
+        if response.status_code == 304 and headers:
+            _, _, body, encoding = self.page_cache.get(url)
+            return _parse_page(body, encoding)
+
         response.raise_for_status()
-        return BeautifulSoup(response.text, "lxml")
+        encoding = response.encoding or "utf-8"
+        if self.page_cache:
+            self.page_cache.put(
+                url,
+                response.content,
+                encoding,
+                response.headers.get("etag"),
+                response.headers.get("last-modified"),
+            )
+        # Raw bytes go straight to lxml, skipping a str decode of the page
+        return _parse_page(response.content, encoding)
 
     async def get_total_pages(self) -> int:
         """Get total number of pages by fetching first page."""
         if self._total_pages is not None:
             return self._total_pages
 
-        soup = await self.fetch_page(1)
-        total_results = self.parser.get_total_results(soup)
+        tree = await self.fetch_page(1)
+        total_results = self.parser.get_total_results(tree)
 
         if total_results:
             self._total_pages = (total_results + self.config.items_per_page - 1) // self.config.items_per_page
         else:
             # Fallback: try to find max page number in pagination
-            self._total_pages = self._find_max_page_from_pagination(soup)
+            self._total_pages = self._find_max_page_from_pagination(tree)
 
         return self._total_pages
 
-    def _find_max_page_from_pagination(self, soup: BeautifulSoup) -> int:
+    def _find_max_page_from_pagination(self, tree: HtmlElement) -> int:
         """Find maximum page number from pagination links."""
-        import re
-
         max_page = 1
         # Look for pagination links with page numbers
-        for link in soup.find_all("a", href=True):
-            href = link["href"]
-            match = re.search(r"_cur=(\d+)", href)
+        for href in tree.xpath("//a[contains(@href, '_cur=')]/@href"):
+            match = _PAGE_PARAM_RE.search(href)
             if match:
                 page_num = int(match.group(1))
                 max_page = max(max_page, page_num)
         return max_page
 
     @abstractmethod
-    def parse_row(self, row) -> Optional[InsuranceProduct]:
-        """Parse a single table row into a product. Implemented by subclasses."""
+    def parse_row(
+        self, cells: list[HtmlElement], scraped_at: datetime
+    ) -> Optional[InsuranceProduct]:
+        """Parse the cells of a table row into a product. Implemented by subclasses.
+
+        cells has at least MIN_CELLS entries. Cell values are already clean
+        strings, so subclasses build products with model_construct (no
+        validation) and the page's scraped_at.
+        """
         pass
 
-    def parse_table(self, soup: BeautifulSoup) -> list[InsuranceProduct]:
+    def parse_table(self, tree: HtmlElement) -> list[InsuranceProduct]:
         """Parse all products from the page table."""
         products = []
-        table = self.parser.find_data_table(soup)
+        table = self.parser.find_data_table(tree)
 
-        if not table:
+        if table is None:
             console.print("[yellow]Warning: No data table found on page[/yellow]")
             return products
 
         rows = self.parser.get_table_rows(table)
+        scraped_at = utcnow()  # one timestamp per page
+        min_cells = self.MIN_CELLS
 
         for row in rows:
+            cells = self.parser.get_cells(row)
+            if len(cells) < min_cells:
+                continue
             try:
-                product = self.parse_row(row)
+                product = self.parse_row(cells, scraped_at)
                 if product:
                     products.append(product)
             except Exception as e:
@@ -113,21 +178,43 @@ class BaseScraper(ABC):
 
     async def scrape_page(self, page: int) -> list[InsuranceProduct]:
         """Scrape a single page and return products."""
-        soup = await self.fetch_page(page)
-        return self.parse_table(soup)
+        tree = await self.fetch_page(page)
+        return self.parse_table(tree)
 
     async def scrape_all_pages(
         self,
         start_page: int = 1,
         end_page: Optional[int] = None,
     ) -> AsyncIterator[tuple[int, list[InsuranceProduct]]]:
-        """Generator that yields (page_number, products) from all pages."""
+        """Generator that yields (page_number, products) from all pages.
+
+        Up to config.max_concurrent_pages pages are fetched concurrently, but
+        pages are always yielded in order so callers can record progress.
+        """
         total = end_page or await self.get_total_pages()
 
-        for page in range(start_page, total + 1):
-            try:
-                products = await self.scrape_page(page)
+        pages = iter(range(start_page, total + 1))
+        in_flight: deque[tuple[int, asyncio.Task]] = deque()
+
+        def schedule_next() -> None:
+            page = next(pages, None)
+            if page is not None:
+                in_flight.append((page, asyncio.create_task(self.scrape_page(page))))
+
+        for _ in range(self.config.max_concurrent_pages):
+            schedule_next()
+
+        try:
+            while in_flight:
+                page, task = in_flight.popleft()
+                schedule_next()
+                try:
+                    products = await task
+                except Exception as e:
+                    console.print(f"[red]Error scraping page {page}: {e}[/red]")
+                    products = []
                 yield page, products
-            except Exception as e:
-                console.print(f"[red]Error scraping page {page}: {e}[/red]")
-                yield page, []
+        finally:
+            # Consumer stopped early: don't leave fetches running
+            for _, task in in_flight:
+                task.cancel()
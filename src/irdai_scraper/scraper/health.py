@@ -1,8 +1,9 @@
 """Scraper for Health Insurance Products page."""
 
+from datetime import datetime
 from typing import Optional
 
-from bs4 import Tag
+from lxml.html import HtmlElement
 
 from ..config import PAGE_CONFIGS, ProductType, ScraperConfig
 from ..models import HealthInsuranceProduct
@@ -12,19 +13,20 @@ from .base import BaseScraper
 class HealthInsuranceScraper(BaseScraper):
     """Scraper for /health-insurance-products page."""
 
+    # Table has 9 columns: checkbox, archive, fy, insurer, uin, product, date, documents, type
+    MIN_CELLS = 8
+
     def __init__(self, config: ScraperConfig):
         super().__init__(config, PAGE_CONFIGS[ProductType.HEALTH])
 
-    def parse_row(self, row: Tag) -> Optional[HealthInsuranceProduct]:
+    def parse_row(
+        self, cells: list[HtmlElement], scraped_at: datetime
+    ) -> Optional[HealthInsuranceProduct]:
         """Parse a table row into a HealthInsuranceProduct."""
-        cells = self.parser.get_cells(row)
-
-        # Table has 9 columns: checkbox, archive, fy, insurer, uin, product, date, documents, type
-        if len(cells) < 8:
-            return None
+        texts = [self.parser.clean_cell_text(cell) for cell in cells]
 
         # Validate UIN field is not empty (skip placeholder/empty rows)
-        uin = self.parser.clean_cell_text(cells[4])
+        uin = texts[4]
         if not uin:
             return None
 
@@ -45,15 +47,16 @@ class HealthInsuranceScraper(BaseScraper):
         # 7: Documents
         # 8: Type of Product
 
-        return HealthInsuranceProduct(
+        return HealthInsuranceProduct.model_construct(
             product_type=ProductType.HEALTH.value,
-            archive_status=self.parser.clean_cell_text(cells[1]),
-            financial_year=self.parser.clean_cell_text(cells[2]),
-            insurer=self.parser.clean_cell_text(cells[3]),
+            archive_status=texts[1],
+            financial_year=texts[2],
+            insurer=texts[3],
             uin=uin,
-            product_name=self.parser.clean_cell_text(cells[5]),
-            date_of_approval=self.parser.clean_cell_text(cells[6]) or None,
-            type_of_product=self.parser.clean_cell_text(cells[8]) if len(cells) > 8 else "",
+            product_name=texts[5],
+            date_of_approval=texts[6] or None,
+            type_of_product=texts[8] if len(cells) > 8 else "",
             document_url=doc_url,
             document_filename=doc_filename,
+            scraped_at=scraped_at,
         )
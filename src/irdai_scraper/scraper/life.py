@@ -1,8 +1,9 @@
 """Scraper for Life Insurance Products page."""
 
+from datetime import datetime
 from typing import Optional
 
-from bs4 import Tag
+from lxml.html import HtmlElement
 
 from ..config import PAGE_CONFIGS, ProductType, ScraperConfig
 from ..models import LifeInsuranceProduct
@@ -12,19 +13,20 @@ from .base import BaseScraper
 class LifeInsuranceScraper(BaseScraper):
     """Scraper for /life-insurance-products page."""
 
+    # Table has 14 columns: checkbox, archive, fy, insurer, product, uin, type, launch, close, protection, par, individual, remarks, download
+    MIN_CELLS = 13
+
     def __init__(self, config: ScraperConfig):
         super().__init__(config, PAGE_CONFIGS[ProductType.LIFE])
 
-    def parse_row(self, row: Tag) -> Optional[LifeInsuranceProduct]:
+    def parse_row(
+        self, cells: list[HtmlElement], scraped_at: datetime
+    ) -> Optional[LifeInsuranceProduct]:
         """Parse a table row into a LifeInsuranceProduct."""
-        cells = self.parser.get_cells(row)
-
-        # Table has 14 columns: checkbox, archive, fy, insurer, product, uin, type, launch, close, protection, par, individual, remarks, download
-        if len(cells) < 13:
-            return None
+        texts = [self.parser.clean_cell_text(cell) for cell in cells]
 
         # Validate UIN field is not empty (skip placeholder/empty rows)
-        uin = self.parser.clean_cell_text(cells[5])
+        uin = texts[5]
         if not uin:
             return None
 
@@ -47,20 +49,21 @@ class LifeInsuranceScraper(BaseScraper):
         # 12: Remarks
         # 13: Download
 
-        return LifeInsuranceProduct(
+        return LifeInsuranceProduct.model_construct(
             product_type=ProductType.LIFE.value,
-            archive_status=self.parser.clean_cell_text(cells[1]),
-            financial_year=self.parser.clean_cell_text(cells[2]),
-            insurer=self.parser.clean_cell_text(cells[3]),
-            product_name=self.parser.clean_cell_text(cells[4]),
+            archive_status=texts[1],
+            financial_year=texts[2],
+            insurer=texts[3],
+            product_name=texts[4],
             uin=uin,
-            type_of_product=self.parser.clean_cell_text(cells[6]),
-            launch_modification_date=self.parser.clean_cell_text(cells[7]) or None,
-            closing_withdrawal_date=self.parser.clean_cell_text(cells[8]) or None,
-            protection_savings_retirement=self.parser.clean_cell_text(cells[9]) or None,
-            par_nonpar=self.parser.clean_cell_text(cells[10]) or None,
-            individual_group=self.parser.clean_cell_text(cells[11]) or None,
-            remarks=self.parser.clean_cell_text(cells[12]) if len(cells) > 12 else None,
+            type_of_product=texts[6],
+            launch_modification_date=texts[7] or None,
+            closing_withdrawal_date=texts[8] or None,
+            protection_savings_retirement=texts[9] or None,
+            par_nonpar=texts[10] or None,
+            individual_group=texts[11] or None,
+            remarks=texts[12] if len(cells) > 12 else None,
             document_url=doc_url,
             document_filename=doc_filename,
+            scraped_at=scraped_at,
         )
@@ -1,8 +1,9 @@
 """Scraper for List of Life Products page."""
 
+from datetime import datetime
 from typing import Optional
 
-from bs4 import Tag
+from lxml.html import HtmlElement
 
 from ..config import PAGE_CONFIGS, ProductType, ScraperConfig
 from ..models import LifeProductListItem
@@ -12,19 +13,20 @@ from .base import BaseScraper
 class LifeProductListScraper(BaseScraper):
     """Scraper for /list-of-life-products page."""
 
+    # Table has 6 columns: checkbox, archive, description, last_updated, sub_title, documents
+    MIN_CELLS = 5
+
     def __init__(self, config: ScraperConfig):
         super().__init__(config, PAGE_CONFIGS[ProductType.LIFE_LIST])
 
-    def parse_row(self, row: Tag) -> Optional[LifeProductListItem]:
+    def parse_row(
+        self, cells: list[HtmlElement], scraped_at: datetime
+    ) -> Optional[LifeProductListItem]:
         """Parse a table row into a LifeProductListItem."""
-        cells = self.parser.get_cells(row)
-
-        # Table has 6 columns: checkbox, archive, description, last_updated, sub_title, documents
-        if len(cells) < 5:
-            return None
+        texts = [self.parser.clean_cell_text(cell) for cell in cells]
 
         # Validate short_description field is not empty (skip placeholder/empty rows)
-        short_description = self.parser.clean_cell_text(cells[2])
+        short_description = texts[2]
         if not short_description:
             return None
 
@@ -39,12 +41,13 @@ class LifeProductListScraper(BaseScraper):
         # 4: Sub Title
         # 5: Documents (XLSX file)
 
-        return LifeProductListItem(
+        return LifeProductListItem.model_construct(
             product_type=ProductType.LIFE_LIST.value,
-            archive_status=self.parser.clean_cell_text(cells[1]),
+            archive_status=texts[1],
             short_description=short_description,
-            last_updated=self.parser.clean_cell_text(cells[3]) or None,
-            sub_title=self.parser.clean_cell_text(cells[4]) or None,
+            last_updated=texts[3] or None,
+            sub_title=texts[4] or None,
             document_url=doc_url,
             document_filename=doc_filename,
+            scraped_at=scraped_at,
         )
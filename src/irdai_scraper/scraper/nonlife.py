@@ -1,8 +1,9 @@
 """Scraper for Non-Life Insurance Products page."""
 
+from datetime import datetime
 from typing import Optional
 
-from bs4 import Tag
+from lxml.html import HtmlElement
 
 from ..config import PAGE_CONFIGS, ProductType, ScraperConfig
 from ..models import NonLifeInsuranceProduct
@@ -12,19 +13,20 @@ from .base import BaseScraper
 class NonLifeInsuranceScraper(BaseScraper):
     """Scraper for /non-life-insurance-products page."""
 
+    # Table has 10 columns: checkbox, archive, s_no, fy, insurer, product, type, uin, date, documents
+    MIN_CELLS = 9
+
     def __init__(self, config: ScraperConfig):
         super().__init__(config, PAGE_CONFIGS[ProductType.NONLIFE])
 
-    def parse_row(self, row: Tag) -> Optional[NonLifeInsuranceProduct]:
+    def parse_row(
+        self, cells: list[HtmlElement], scraped_at: datetime
+    ) -> Optional[NonLifeInsuranceProduct]:
         """Parse a table row into a NonLifeInsuranceProduct."""
-        cells = self.parser.get_cells(row)
-
-        # Table has 10 columns: checkbox, archive, s_no, fy, insurer, product, type, uin, date, documents
-        if len(cells) < 9:
-            return None
+        texts = [self.parser.clean_cell_text(cell) for cell in cells]
 
         # Validate UIN field is not empty (skip placeholder/empty rows)
-        uin = self.parser.clean_cell_text(cells[7])
+        uin = texts[7]
         if not uin:
             return None
 
@@ -43,16 +45,17 @@ class NonLifeInsuranceScraper(BaseScraper):
         # 8: Date of Approval
         # 9: Documents
 
-        return NonLifeInsuranceProduct(
+        return NonLifeInsuranceProduct.model_construct(
             product_type=ProductType.NONLIFE.value,
-            archive_status=self.parser.clean_cell_text(cells[1]),
-            s_no=self.parser.clean_cell_text(cells[2]) or None,
-            financial_year=self.parser.clean_cell_text(cells[3]),
-            insurer=self.parser.clean_cell_text(cells[4]),
-            product_name=self.parser.clean_cell_text(cells[5]),
-            type_of_product=self.parser.clean_cell_text(cells[6]),
+            archive_status=texts[1],
+            s_no=texts[2] or None,
+            financial_year=texts[3],
+            insurer=texts[4],
+            product_name=texts[5],
+            type_of_product=texts[6],
             uin=uin,
-            date_of_approval=self.parser.clean_cell_text(cells[8]) or None,
+            date_of_approval=texts[8] or None,
             document_url=doc_url,
             document_filename=doc_filename,
+            scraped_at=scraped_at,
         )
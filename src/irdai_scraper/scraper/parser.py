@@ -4,7 +4,12 @@ import re
 from typing import Optional
 from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup, Tag
+from lxml.html import HtmlElement
+
+_ONCLICK_URL_RE = re.compile(r"window\.open\(['\"]([^'\"]+)['\"]")
+_FILENAME_RE = re.compile(r"/([^/]+\.(pdf|xlsx|xls))", re.IGNORECASE)
+_TOTAL_RESULTS_RE = re.compile(r"of\s+([\d,]+)\s+results?", re.IGNORECASE)
+_DOCUMENT_HREF_MARKERS = (".pdf", ".xlsx", ".xls", "/documents/")
 
 
 class LiferayTableParser:
@@ -13,72 +18,74 @@ class LiferayTableParser:
     def __init__(self, base_url: str = "https://irdai.gov.in"):
         self.base_url = base_url
 
-    def find_data_table(self, soup: BeautifulSoup) -> Optional[Tag]:
+    def find_data_table(self, tree: HtmlElement) -> Optional[HtmlElement]:
         """Find the main data table in the page."""
         # Try different table selectors used by Liferay
-        table = soup.find("table", class_=lambda x: x and "table" in str(x).lower())
-        if not table:
+        tables = tree.xpath("//table[contains(@class, 'table')]")
+        if not tables:
             # Look for table inside portlet content
-            portlet = soup.find("div", class_=lambda x: x and "portlet" in str(x).lower())
-            if portlet:
-                table = portlet.find("table")
-        return table
+            tables = tree.xpath("(//div[contains(@class, 'portlet')])[1]//table")
+        return tables[0] if tables else None
 
-    def get_table_rows(self, table: Tag) -> list[Tag]:
+    def get_table_rows(self, table: HtmlElement) -> list[HtmlElement]:
         """Get data rows from table (skip header)."""
-        tbody = table.find("tbody")
-        if tbody:
-            return tbody.find_all("tr")
-        rows = table.find_all("tr")
+        tbody = table.find(".//tbody")
+        if tbody is not None:
+            return tbody.xpath(".//tr")
+        rows = table.xpath(".//tr")
         # Skip header row
-        return rows[1:] if rows else []
+        return rows[1:]
 
-    def get_cells(self, row: Tag) -> list[Tag]:
+    def get_cells(self, row: HtmlElement) -> list[HtmlElement]:
         """Get all cells from a table row."""
-        return row.find_all(["td", "th"])
+        return row.xpath(".//td | .//th")
 
-    def clean_cell_text(self, cell: Tag) -> str:
+    def clean_cell_text(self, cell: HtmlElement) -> str:
         """Extract and clean text from a table cell."""
-        # Get text, preserving some structure
-        text = cell.get_text(separator=" ", strip=True)
-        # Normalize whitespace
-        text = re.sub(r"\s+", " ", text)
-        return text.strip()
+        # Join text nodes with spaces (so <br>-separated lines don't run
+        # together) and normalize whitespace
+        return " ".join(" ".join(cell.itertext()).split())
 
-    def extract_document_link(self, cell: Tag) -> tuple[Optional[str], Optional[str]]:
+    def extract_document_link(self, cell: HtmlElement) -> tuple[Optional[str], Optional[str]]:
         """Extract document URL and filename from cell.
 
         Returns:
             Tuple of (url, filename)
         """
-        # Look for direct links
-        for link in cell.find_all("a", href=True):
-            href = link["href"]
-            if any(ext in href.lower() for ext in [".pdf", ".xlsx", ".xls", "/documents/"]):
-                # Make URL absolute
-                url = urljoin(self.base_url, href)
-                # Extract filename from link text or URL
-                filename = link.get_text(strip=True)
-                if not filename or len(filename) < 3:
-                    # Try to extract from URL
-                    filename = self._extract_filename_from_url(href)
-                return url, filename
-
-        # Check onclick handlers for document URLs
-        for elem in cell.find_all(attrs={"onclick": True}):
-            onclick = elem.get("onclick", "")
-            url_match = re.search(r"window\.open\(['\"]([^'\"]+)['\"]", onclick)
-            if url_match:
-                url = urljoin(self.base_url, url_match.group(1))
-                filename = self._extract_filename_from_url(url)
-                return url, filename
+        # Walk links and onclick handlers in one pass. Direct links take
+        # precedence, so the first onclick URL is only kept as a fallback.
+        onclick_url = None
+        for node in cell.xpath(".//a[@href] | .//*[@onclick]"):
+            href = node.get("href") if node.tag == "a" else None
+            if href is not None:
+                href_lower = href.lower()
+                if any(marker in href_lower for marker in _DOCUMENT_HREF_MARKERS):
+                    # Make URL absolute
+                    url = urljoin(self.base_url, href)
+                    # Extract filename from link text or URL
+                    filename = "".join(t.strip() for t in node.itertext())
+                    if not filename or len(filename) < 3:
+                        # Try to extract from URL
+                        filename = self._extract_filename_from_url(href)
+                    return url, filename
+
+            if onclick_url is None:
+                onclick = node.get("onclick")
+                if onclick:
+                    url_match = _ONCLICK_URL_RE.search(onclick)
+                    if url_match:
+                        onclick_url = urljoin(self.base_url, url_match.group(1))
+
+        # Fall back to a document URL from an onclick handler
+        if onclick_url is not None:
+            return onclick_url, self._extract_filename_from_url(onclick_url)
 
         return None, None
 
     def _extract_filename_from_url(self, url: str) -> Optional[str]:
         """Extract filename from a URL."""
         # Match common patterns like /filename.pdf or /filename.xlsx
-        match = re.search(r"/([^/]+\.(pdf|xlsx|xls))", url, re.IGNORECASE)
+        match = _FILENAME_RE.search(url)
         if match:
             return match.group(1)
         # Try to get last path segment
@@ -88,11 +95,10 @@ class LiferayTableParser:
                 return part.split("?")[0]
         return None
 
-    def detect_archive_status(self, row: Tag) -> str:
+    def detect_archive_status(self, row: HtmlElement) -> str:
         """Detect if row represents archived product."""
         # Check row classes
-        row_classes = row.get("class", [])
-        if any("archive" in str(c).lower() for c in row_classes):
+        if "archive" in row.get("class", "").lower():
             return "Archived"
 
         # Check first cell content
@@ -106,23 +112,30 @@ class LiferayTableParser:
 
         return "Non-Archived"
 
-    def get_total_results(self, soup: BeautifulSoup) -> Optional[int]:
+    def get_total_results(self, tree: HtmlElement) -> Optional[int]:
         """Extract total number of results from page."""
-        # Look for "Showing X - Y of Z results" pattern
-        text = soup.get_text()
-        match = re.search(r"of\s+([\d,]+)\s+results?", text, re.IGNORECASE)
+        # Look for "Showing X - Y of Z results" pattern, first in the
+        # pagination/results summary and only then in the whole page text
+        summary = " ".join(
+            tree.xpath(
+                "//*[contains(@class, 'pagination') or contains(@class, 'results')]//text()"
+            )
+        )
+        match = _TOTAL_RESULTS_RE.search(summary) or _TOTAL_RESULTS_RE.search(
+            tree.text_content()
+        )
         if match:
             return int(match.group(1).replace(",", ""))
         return None
 
-    def get_current_page(self, soup: BeautifulSoup) -> int:
+    def get_current_page(self, tree: HtmlElement) -> int:
         """Get current page number from pagination."""
         # Look for active/current page indicator
-        pagination = soup.find("ul", class_=lambda x: x and "pagination" in str(x).lower())
-        if pagination:
-            active = pagination.find("li", class_=lambda x: x and "active" in str(x).lower())
-            if active:
-                text = active.get_text(strip=True)
-                if text.isdigit():
-                    return int(text)
+        active = tree.xpath(
+            "(//ul[contains(@class, 'pagination')])[1]//li[contains(@class, 'active')]"
+        )
+        if active:
+            text = active[0].text_content().strip()
+            if text.isdigit():
+                return int(text)
         return 1
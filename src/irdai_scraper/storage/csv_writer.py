@@ -1,34 +1,55 @@
 """CSV output handler for scraped metadata."""
 
 import csv
+from contextlib import contextmanager
+from operator import attrgetter
 from pathlib import Path
-from typing import Optional
+from typing import Any, Iterator, Optional, TextIO
 
 from ..config import PAGE_CONFIGS, ProductType, ScraperConfig
 from ..models import InsuranceProduct
 
 
+class _ProductAppender:
+    """Writes products as rows to an open CSV (see CSVWriter.append_session)."""
+
+    def __init__(self, csv_writer: "CSVWriter", product_type: ProductType, file, writer):
+        self._csv_writer = csv_writer
+        self._product_type = product_type
+        self._file = file
+        self._writer = writer
+
+    def __call__(self, product: InsuranceProduct) -> None:
+        self._writer.writerow(self._csv_writer._product_to_row(product, self._product_type))
+
+    def flush(self) -> None:
+        """Push buffered rows to disk."""
+        self._file.flush()
+
+
 class CSVWriter:
     """Handles CSV output for scraped product metadata."""
 
+    FILENAMES = {
+        ProductType.LIFE: "life_insurance_products.csv",
+        ProductType.LIFE_LIST: "life_products_list.csv",
+        ProductType.NONLIFE: "nonlife_insurance_products.csv",
+        ProductType.HEALTH: "health_insurance_products.csv",
+    }
+
+    # Header row per product type: configured columns plus the scrape timestamp
+    HEADERS = {pt: [*PAGE_CONFIGS[pt].columns, "scraped_at"] for pt in ProductType}
+
     def __init__(self, config: ScraperConfig):
         self.config = config
         self.metadata_dir = config.data_dir / "metadata"
         self._files: dict[str, tuple[Path, bool]] = {}  # track which files exist
+        # One getter per product type returning all column values as a tuple
+        self._getters = {pt: attrgetter(*PAGE_CONFIGS[pt].columns) for pt in ProductType}
 
     def _get_csv_path(self, product_type: ProductType) -> Path:
         """Get CSV file path for a product type."""
-        filenames = {
-            ProductType.LIFE: "life_insurance_products.csv",
-            ProductType.LIFE_LIST: "life_products_list.csv",
-            ProductType.NONLIFE: "nonlife_insurance_products.csv",
-            ProductType.HEALTH: "health_insurance_products.csv",
-        }
-        return self.metadata_dir / filenames[product_type]
-
-    def _get_columns(self, product_type: ProductType) -> list[str]:
-        """Get column names for a product type."""
-        return PAGE_CONFIGS[product_type].columns
+        return self.metadata_dir / self.FILENAMES[product_type]
 
     def _ensure_directory(self) -> None:
         """Ensure metadata directory exists."""
@@ -36,25 +57,43 @@ class CSVWriter:
 
     def _product_to_row(
         self, product: InsuranceProduct, product_type: ProductType
-    ) -> dict[str, str]:
-        """Convert a product to a CSV row dict."""
-        columns = self._get_columns(product_type)
-        row = {}
-
-        for col in columns:
-            value = getattr(product, col, None)
-            if value is None:
-                row[col] = ""
-            elif isinstance(value, (list, dict)):
-                row[col] = str(value)
-            else:
-                row[col] = str(value)
+    ) -> list[str]:
+        """Convert a product to a CSV row, in column order."""
+        row = [
+            "" if value is None else str(value)
+            for value in self._getters[product_type](product)
+        ]
 
         # Add scraped_at timestamp
-        row["scraped_at"] = product.scraped_at.isoformat()
+        row.append(product.scraped_at.isoformat())
 
         return row
 
+    @contextmanager
+    def _open_writer(
+        self, product_type: ProductType, append: bool = True
+    ) -> Iterator[tuple[TextIO, Any]]:
+        """Open the CSV for a product type and yield the file and a csv writer.
+
+        The header is written when the file is new, empty, or being overwritten.
+        """
+        self._ensure_directory()
+        csv_path = self._get_csv_path(product_type)
+
+        # Check if file exists and has content
+        file_exists = csv_path.exists() and csv_path.stat().st_size > 0
+        mode = "a" if append and file_exists else "w"
+        write_header = mode == "w" or not file_exists
+
+        # Large buffer so streamed rows are flushed in few syscalls
+        with open(csv_path, mode, newline="", encoding="utf-8", buffering=1 << 20) as f:
+            writer = csv.writer(f)
+
+            if write_header:
+                writer.writerow(self.HEADERS[product_type])
+
+            yield f, writer
+
     def write_products(
         self,
         products: list[InsuranceProduct],
@@ -74,26 +113,27 @@ class CSVWriter:
         if not products:
             return 0
 
-        self._ensure_directory()
-        csv_path = self._get_csv_path(product_type)
-        columns = self._get_columns(product_type) + ["scraped_at"]
-
-        # Check if file exists and has content
-        file_exists = csv_path.exists() and csv_path.stat().st_size > 0
-        mode = "a" if append and file_exists else "w"
-        write_header = mode == "w" or not file_exists
+        with self._open_writer(product_type, append) as (_, writer):
+            writer.writerows(self._product_to_row(p, product_type) for p in products)
 
-        with open(csv_path, mode, newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=columns, extrasaction="ignore")
+        return len(products)
 
-            if write_header:
-                writer.writeheader()
+    @contextmanager
+    def append_session(
+        self, product_type: ProductType
+    ) -> Iterator[_ProductAppender]:
+        """Keep the CSV open for appending and yield a callable that writes one product.
 
-            for product in products:
-                row = self._product_to_row(product, product_type)
-                writer.writerow(row)
+        Lets callers stream rows as products finish processing instead of
+        buffering them for a single write_products call. Rows are buffered;
+        call write_product.flush() before recording progress that depends on them.
 
-        return len(products)
+        Example:
+            with csv_writer.append_session(ProductType.LIFE) as write_product:
+                write_product(product)
+        """
+        with self._open_writer(product_type, append=True) as (f, writer):
+            yield _ProductAppender(self, product_type, f, writer)
 
     def get_existing_count(self, product_type: ProductType) -> int:
         """Get count of existing records in CSV."""
@@ -0,0 +1,76 @@
+"""SQLite-backed HTTP validator cache for listing pages."""
+
+import sqlite3
+import time
+from typing import Optional
+
+from ..config import ScraperConfig
+
+
+class PageCache:
+    """Caches page bodies with their ETag/Last-Modified for conditional GETs."""
+
+    def __init__(self, config: ScraperConfig):
+        self.config = config
+        self.db_file = config.data_dir / "cache" / "etag_cache.sqlite"
+        self._conn: Optional[sqlite3.Connection] = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """Get database connection, creating the schema if needed."""
+        if self._conn is None:
+            self.db_file.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.db_file)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS pages ("
+                "url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, "
+                "body BLOB NOT NULL, encoding TEXT NOT NULL, fetched_at INTEGER NOT NULL)"
+            )
+        return self._conn
+
+    def get(self, url: str) -> Optional[tuple[Optional[str], Optional[str], bytes, str]]:
+        """Get cached (etag, last_modified, body, encoding) for a URL.
+
+        Bodies are raw response bytes, decoded with the stored encoding.
+        """
+        return self.conn.execute(
+            "SELECT etag, last_modified, body, encoding FROM pages WHERE url = ?", (url,)
+        ).fetchone()
+
+    def conditional_headers(self, url: str) -> dict[str, str]:
+        """Build If-None-Match / If-Modified-Since headers for a cached URL."""
+        entry = self.get(url)
+        if entry is None:
+            return {}
+
+        etag, last_modified, _, _ = entry
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        return headers
+
+    def put(
+        self,
+        url: str,
+        body: bytes,
+        encoding: str,
+        etag: Optional[str],
+        last_modified: Optional[str],
+    ) -> None:
+        """Store a page body. Pages without validators are not cached."""
+        if not etag and not last_modified:
+            return
+
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, body, encoding, int(time.time())),
+            )
+
+    def close(self) -> None:
+        """Close the database connection."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
@@ -1,50 +1,137 @@
 """JSON-based state management for resume capability."""
 
-import json
-from datetime import datetime
+import atexit
+import os
+import time
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Optional, TextIO
+
+import orjson
 
 from ..config import ProductType, ScraperConfig
 from ..models import FailedDownload, ScraperState, SessionState
+from ..utils import url_key, utcnow
+
+# Pending changes are saved after this many updates, even between
+# flush_if_dirty() calls (e.g. during a long batch of downloads)
+FLUSH_EVERY_OPS = 100
+
+
+def _parse_datetime(value: Optional[str]) -> Optional[datetime]:
+    """Parse an ISO timestamp from the state file (naive values are UTC)."""
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
 
 
 class StateManager:
-    """Manages scraper state using JSON file for resume capability."""
+    """Manages scraper state using JSON file for resume capability.
+
+    Page progress and download results are kept in memory until
+    flush_if_dirty() or flush() is called, FLUSH_EVERY_OPS updates pile up,
+    or the interpreter exits; session changes are saved at once.
+    Completed download URLs are appended to a separate log rather than
+    rewritten with the rest of the state on every save.
+    """
 
     def __init__(self, config: ScraperConfig):
         self.config = config
         self.state_file = config.data_dir / "state.json"
+        self.completed_log_file = config.data_dir / "completed_downloads.log"
         self._state: Optional[ScraperState] = None
+        self._completed_log: Optional[TextIO] = None
+        # Frequent updates only mark the state dirty; see flush_if_dirty
+        self._dirty = False
+        self._pending_ops = 0
+        self._last_save = 0.0
+        # Keep pending progress if the process exits without calling flush()
+        atexit.register(self.flush)
 
     def _load_state(self) -> ScraperState:
-        """Load state from JSON file."""
+        """Load state from the JSON file and the completed downloads log."""
+        state, legacy = self._load_state_file()
+
+        # Older state files kept completed URLs inline; move them to the log
+        state.completed_downloads = self._read_completed_log()
+        missing = [url for url in legacy if url_key(url) not in state.completed_downloads]
+        if missing:
+            self._append_completed(missing)
+            state.completed_downloads.update(map(url_key, missing))
+            self._dirty = True  # rewrite state.json without them
+
+        return state
+
+    def _read_completed_log(self) -> set[int]:
+        """Read completed URLs from the append-only log, as url_key hashes.
+
+        A log with duplicate lines (e.g. from two runs appending to it at
+        once) is compacted in place.
+        """
+        if not self.completed_log_file.exists():
+            return set()
+        lines = self.completed_log_file.read_text(encoding="utf-8").splitlines()
+        urls = dict.fromkeys(lines)  # dedupes, keeping first-seen order
+
+        if len(urls) < len(lines):
+            tmp_file = self.completed_log_file.with_suffix(".log.tmp")
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                f.writelines(f"{url}\n" for url in urls)
+            os.replace(tmp_file, self.completed_log_file)
+
+        return set(map(url_key, urls))
+
+    def _append_completed(self, urls: Iterable[str]) -> None:
+        """Append completed URLs to the log (flushed with the state)."""
+        if self._completed_log is None:
+            self.completed_log_file.parent.mkdir(parents=True, exist_ok=True)
+            self._completed_log = open(self.completed_log_file, "a", encoding="utf-8")
+        self._completed_log.writelines(f"{url}\n" for url in urls)
+
+    def _load_state_file(self) -> tuple[ScraperState, list[str]]:
+        """Load state from JSON file.
+
+        Returns:
+            Tuple of (state, completed URLs stored inline by older versions)
+        """
         if self.state_file.exists():
             try:
-                with open(self.state_file, "r") as f:
-                    data = json.load(f)
+                data = orjson.loads(self.state_file.read_bytes())
 
                 # Convert sessions dict
                 sessions = {}
                 for key, val in data.get("sessions", {}).items():
-                    sessions[key] = SessionState(**val)
+                    sessions[key] = SessionState(
+                        last_completed_page=val.get("last_completed_page", 0),
+                        status=val.get("status", "pending"),
+                        total_products=val.get("total_products", 0),
+                        started_at=_parse_datetime(val.get("started_at")),
+                        completed_at=_parse_datetime(val.get("completed_at")),
+                    )
 
-                # Convert failed downloads
-                failed = [FailedDownload(**fd) for fd in data.get("failed_downloads", [])]
+                # Convert failed downloads (stored as a list, keyed by URL in memory)
+                failed = {
+                    fd["url"]: FailedDownload(
+                        url=fd["url"],
+                        error=fd["error"],
+                        retries=fd.get("retries", 0),
+                        last_attempt=_parse_datetime(fd.get("last_attempt")) or utcnow(),
+                    )
+                    for fd in data.get("failed_downloads", [])
+                }
 
-                return ScraperState(
+                state = ScraperState(
                     sessions=sessions,
-                    completed_downloads=set(data.get("completed_downloads", [])),
                     failed_downloads=failed,
-                    last_updated=datetime.fromisoformat(data["last_updated"])
-                    if "last_updated" in data
-                    else datetime.utcnow(),
+                    last_updated=_parse_datetime(data.get("last_updated")) or utcnow(),
                 )
-            except (json.JSONDecodeError, KeyError, ValueError):
+                return state, data.get("completed_downloads", [])
+            except (orjson.JSONDecodeError, KeyError, ValueError):
                 # Corrupted state file, start fresh
                 pass
 
-        return ScraperState()
+        return ScraperState(), []
 
     def _save_state(self) -> None:
         """Save state to JSON file."""
@@ -54,33 +141,42 @@ class StateManager:
         # Ensure directory exists
         self.state_file.parent.mkdir(parents=True, exist_ok=True)
 
-        # Convert to JSON-serializable format
+        # orjson serializes the session and failure dataclasses (and their
+        # datetimes, as ISO 8601) natively; completed downloads live in the log
+        self._state.last_updated = utcnow()
         data = {
-            "sessions": {
-                key: {
-                    "last_completed_page": val.last_completed_page,
-                    "status": val.status,
-                    "total_products": val.total_products,
-                    "started_at": val.started_at.isoformat() if val.started_at else None,
-                    "completed_at": val.completed_at.isoformat() if val.completed_at else None,
-                }
-                for key, val in self._state.sessions.items()
-            },
-            "completed_downloads": list(self._state.completed_downloads),
-            "failed_downloads": [
-                {
-                    "url": fd.url,
-                    "error": fd.error,
-                    "retries": fd.retries,
-                    "last_attempt": fd.last_attempt.isoformat(),
-                }
-                for fd in self._state.failed_downloads
-            ],
-            "last_updated": datetime.utcnow().isoformat(),
+            "sessions": self._state.sessions,
+            "failed_downloads": list(self._state.failed_downloads.values()),
+            "last_updated": self._state.last_updated,
         }
 
-        with open(self.state_file, "w") as f:
-            json.dump(data, f, indent=2)
+        if self._completed_log is not None:
+            self._completed_log.flush()
+        # Write a sibling file and rename it over state.json, so a crash
+        # mid-write never leaves a truncated state file behind
+        tmp_file = self.state_file.with_suffix(".json.tmp")
+        tmp_file.write_bytes(orjson.dumps(data))
+        os.replace(tmp_file, self.state_file)
+        self._dirty = False
+        self._pending_ops = 0
+        self._last_save = time.monotonic()
+
+    def _mark_dirty(self) -> None:
+        """Record an unsaved change, saving once FLUSH_EVERY_OPS have piled up."""
+        self._dirty = True
+        self._pending_ops += 1
+        if self._pending_ops >= FLUSH_EVERY_OPS:
+            self._save_state()
+
+    def flush_if_dirty(self, min_interval: float = 2.0) -> None:
+        """Save pending changes if the last save was at least min_interval seconds ago."""
+        if self._dirty and time.monotonic() - self._last_save >= min_interval:
+            self._save_state()
+
+    def flush(self) -> None:
+        """Save pending changes now."""
+        if self._dirty:
+            self._save_state()
 
     @property
     def state(self) -> ScraperState:
@@ -101,7 +197,7 @@ class StateManager:
         session = self.get_session(product_type)
         if session.status != "running":
             session.status = "running"
-            session.started_at = datetime.utcnow()
+            session.started_at = utcnow()
         self._save_state()
         return session
 
@@ -109,8 +205,7 @@ class StateManager:
         """Update the last completed page for a session."""
         session = self.get_session(product_type)
         session.last_completed_page = page
-        self.state.last_updated = datetime.utcnow()
-        self._save_state()
+        self._mark_dirty()  # last_updated is stamped when the state is saved
 
     def get_last_completed_page(self, product_type: ProductType) -> int:
         """Get the last completed page for a session."""
@@ -120,7 +215,7 @@ class StateManager:
         """Mark a session as completed."""
         session = self.get_session(product_type)
         session.status = "completed"
-        session.completed_at = datetime.utcnow()
+        session.completed_at = utcnow()
         session.total_products = total_products
         self._save_state()
 
@@ -132,39 +227,40 @@ class StateManager:
 
     def is_download_completed(self, url: str) -> bool:
         """Check if a URL has already been downloaded."""
-        return url in self.state.completed_downloads
+        return url_key(url) in self.state.completed_downloads
+
+    def get_completed_downloads(self) -> set[int]:
+        """Get a snapshot of all downloaded URLs, as url_key hashes."""
+        return set(self.state.completed_downloads)
 
     def mark_download_completed(self, url: str) -> None:
         """Mark a URL as downloaded."""
-        self.state.completed_downloads.add(url)
-        self._save_state()
+        key = url_key(url)
+        if key not in self.state.completed_downloads:
+            self.state.completed_downloads.add(key)
+            self._append_completed((url,))
+            self._mark_dirty()
 
     def mark_download_failed(self, url: str, error: str) -> None:
         """Record a failed download."""
         # Update existing or add new
-        for fd in self.state.failed_downloads:
-            if fd.url == url:
-                fd.error = error
-                fd.retries += 1
-                fd.last_attempt = datetime.utcnow()
-                self._save_state()
-                return
-
-        self.state.failed_downloads.append(
-            FailedDownload(url=url, error=error, retries=1)
-        )
-        self._save_state()
+        fd = self.state.failed_downloads.get(url)
+        if fd is not None:
+            fd.error = error
+            fd.retries += 1
+            fd.last_attempt = utcnow()
+        else:
+            self.state.failed_downloads[url] = FailedDownload(url=url, error=error, retries=1)
+        self._mark_dirty()
 
     def get_failed_downloads(self) -> list[FailedDownload]:
         """Get all failed downloads."""
-        return self.state.failed_downloads
+        return list(self.state.failed_downloads.values())
 
     def clear_failed_download(self, url: str) -> None:
         """Remove a URL from failed downloads (after successful retry)."""
-        self.state.failed_downloads = [
-            fd for fd in self.state.failed_downloads if fd.url != url
-        ]
-        self._save_state()
+        if self.state.failed_downloads.pop(url, None) is not None:
+            self._mark_dirty()
 
     def reset_session(self, product_type: ProductType) -> None:
         """Reset a session to start from scratch."""
@@ -175,6 +271,10 @@ class StateManager:
 
     def reset_all(self) -> None:
         """Reset all state."""
+        if self._completed_log is not None:
+            self._completed_log.close()
+            self._completed_log = None
+        self.completed_log_file.unlink(missing_ok=True)
         self._state = ScraperState()
         self._save_state()
 
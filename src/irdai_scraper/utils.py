@@ -0,0 +1,30 @@
+"""Small helpers shared across the scraper and scripts."""
+
+import asyncio
+import hashlib
+from datetime import datetime, timezone
+from typing import Any, Coroutine, TypeVar
+
+try:
+    import uvloop
+except ImportError:  # optional, see the "fast" extra
+    uvloop = None
+
+T = TypeVar("T")
+
+
+def url_key(url: str) -> int:
+    """Hash a URL to a 64-bit int for compact membership checks."""
+    return int.from_bytes(hashlib.blake2b(url.encode(), digest_size=8).digest(), "little")
+
+
+def utcnow() -> datetime:
+    """Current time as a timezone-aware UTC datetime."""
+    return datetime.now(timezone.utc)
+
+
+def run_async(main: Coroutine[Any, Any, T]) -> T:
+    """Run a coroutine like asyncio.run, on uvloop when it is installed."""
+    loop_factory = uvloop.new_event_loop if uvloop is not None else None
+    with asyncio.Runner(loop_factory=loop_factory) as runner:
+        return runner.run(main)